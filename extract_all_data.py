@@ -12,111 +12,206 @@
 # 6. Provides detailed breakdown of 2025 contract statuses
 # ========================================================================
 
-import pandas as pd
+import io
+import os
+import sys
 import unicodedata
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
 
 
 # ========================================================================
 # DATA PREPARATION AND CLEANING FUNCTIONS
 # ========================================================================
 
+# Lookup table mapping the accented letters common in NBA player names to
+# their plain ASCII form (ć → c, ö → o, ...). It is built once at import time
+# from the same NFKD conversion used as the fallback below, so both paths
+# always agree
+_ACCENTED_LETTERS = "áàâäãåāăąćčçďéèêëěēęğģíìîïīįķĺľļłńňñņóòôöõőøŕřśšşťţúùûüůűūýÿźžż"
+_ACCENT_MAP = str.maketrans({
+   letter: unicodedata.normalize("NFKD", letter).encode("ASCII", "ignore").decode("utf-8")
+   for letter in _ACCENTED_LETTERS + _ACCENTED_LETTERS.upper()
+})
+
+
 # Helper function: normalize player names (remove accents like ć → c)
 # This helps with matching names across different datasets that might use
 # different encodings or representations of the same name
 def normalize_name(name):
    if isinstance(name, str):
-       # Normalize Unicode characters and convert to ASCII (removing accents)
+       # Strip known accents with the lookup table, which avoids the Unicode
+       # database lookup and encode/decode round trip for almost every name
+       name = name.translate(_ACCENT_MAP)
+       if name.isascii():
+           return name
+       # Rare characters missing from the table: normalize Unicode characters
+       # and convert to ASCII (removing accents)
        return unicodedata.normalize('NFKD', name).encode('ASCII', 'ignore').decode('utf-8')
    return name
 
 
-# ========================================================================
-# LOADING AND PROCESSING SALARY DATA
-# ========================================================================
-
-# Load salary data from Excel file
-df = pd.read_excel("QSAO CASECOMP NBASALARY.xlsx")
-
-# Fix the headers (first row contains column names)
-df.columns = df.iloc[0]
-df = df.iloc[1:]  # Skip the first row since it's now used as header
-
-# Standardize column names for consistency
-df = df.rename(columns={"Player": "Name", "Tm": "Team"})
+# Helper function: normalize a column of player names; missing names stay missing
+def normalize_names(names):
+   return names.map(normalize_name, na_action="ignore")
+
+
+# Helper function: load an Excel sheet, caching it as a parquet file next to
+# the workbook. Parsing the Excel XML is by far the slowest step of the script,
+# so later runs read the much faster parquet copy instead. The cache always
+# holds the whole sheet and is rebuilt whenever the workbook is newer than its
+# parquet copy; usecols (a list of column names) is applied when returning, so
+# callers asking for different columns share the same cache. The cache is keyed
+# only on the workbook path, so each workbook must always be loaded with the
+# same header and other read options. Caching is best effort: if the parquet
+# copy can't be read or written the workbook is used directly
+def load_excel_cached(xlsx_path, usecols=None, **read_kwargs):
+   if usecols is not None and not (
+       isinstance(usecols, (list, tuple)) and all(isinstance(col, str) for col in usecols)
+   ):
+       raise TypeError("usecols must be a list of column names")
+
+   cache_path = os.path.splitext(xlsx_path)[0] + ".cache.parquet"
+   data = None
+   if os.path.exists(cache_path) and os.path.getmtime(cache_path) >= os.path.getmtime(xlsx_path):
+       try:
+           data = pd.read_parquet(cache_path)
+       except (ImportError, OSError, TypeError, ValueError):
+           data = None
+
+   if data is None:
+       data = pd.read_excel(xlsx_path, **read_kwargs)
+       try:
+           data.to_parquet(cache_path)
+       except (ImportError, OSError, TypeError, ValueError):
+           # No parquet engine installed, the folder is read-only, or the data
+           # can't be converted to parquet; skip caching
+           pass
+
+   if usecols is None:
+       return data
+   missing = [col for col in usecols if col not in data.columns]
+   if missing:
+       raise ValueError(f"{xlsx_path} has no columns named {missing}")
+   # Keep the sheet's column order, as read_excel(usecols=...) does
+   return data[[col for col in data.columns if col in usecols]]
 
 
 # ========================================================================
-# FILTERING FOR MIAMI HEAT PLAYERS
+# MAIN ANALYSIS PIPELINE
 # ========================================================================
 
-# Extract only Miami Heat players (Team code: MIA)
-miami_df = df[df["Team"] == "MIA"].copy()
-
-# Convert salary column to numeric for proper sorting
-miami_df["2024-25"] = pd.to_numeric(miami_df["2024-25"], errors="coerce")
+# Run the full Miami Heat analysis once: load and merge the salary and
+# statistics data, value each player, classify archetypes and print the results
+# to the given text stream (standard output by default)
+def analyze_heat(out=None):
+   if out is None:
+       out = sys.stdout
+
+   # ========================================================================
+   # LOADING AND PROCESSING SALARY DATA
+   # ========================================================================
+
+   # Load salary data from Excel file, keeping only the columns we use
+   # The real column names are on the second row of the sheet
+   df = load_excel_cached(
+       "QSAO CASECOMP NBASALARY.xlsx",
+       header=1,
+       usecols=["Player", "Tm", "2024-25"],
+   )
 
-# Add normalized names column to help with merging datasets
-miami_df["Normalized Name"] = miami_df["Name"].apply(normalize_name)
+   # Standardize column names for consistency
+   df = df.rename(columns={"Player": "Name", "Tm": "Team"})
 
-# Sort players by salary (highest paid first)
-miami_sorted = miami_df.sort_values(by="2024-25", ascending=False)
 
+   # ========================================================================
+   # FILTERING FOR MIAMI HEAT PLAYERS
+   # ========================================================================
 
-# ========================================================================
-# LOADING AND PROCESSING PLAYER STATISTICS
-# ========================================================================
+   # Extract only Miami Heat players (Team code: MIA) and add normalized names
+   # to help with merging datasets. assign() builds the filtered table with the
+   # new column in one step, so no defensive copy is needed
+   miami_df = df.loc[df["Team"].eq("MIA")].assign(
+       **{"Normalized Name": lambda d: normalize_names(d["Name"])}
+   )
 
-# Load player statistics data from Excel file
-player_stats = pd.read_excel("QSAO CASECOMP PLAYERDATA.xlsx")
 
-# Filter for only Miami Heat players
-player_stats_mia = player_stats[player_stats["Team"] == "MIA"].copy()
+   # ========================================================================
+   # LOADING AND PROCESSING PLAYER STATISTICS
+   # ========================================================================
 
-# Add normalized names for matching with salary data
-player_stats_mia["Normalized Name"] = player_stats_mia["Player"].apply(normalize_name)
+   # Load player statistics data from Excel file, keeping only the columns we use
+   player_stats = load_excel_cached(
+       "QSAO CASECOMP PLAYERDATA.xlsx",
+       usecols=[
+           "Player", "Team", "Pos", "Age", "PTS", "AST", "TRB", "STL", "BLK", "TOV",
+           "FG%", "3P%", "FT%",
+       ],
+   )
 
+   # Filter for only Miami Heat players and add normalized names for
+   # matching with salary data
+   player_stats_mia = player_stats.loc[player_stats["Team"].eq("MIA")].assign(
+       **{"Normalized Name": lambda d: normalize_names(d["Player"])}
+   )
 
-# ========================================================================
-# MERGING SALARY AND STATISTICS DATA
-# ========================================================================
 
-# Combine salary and stats data using normalized names as the matching key
-# Using left join to keep all salary entries, even if stats aren't found
-miami_combined = miami_sorted.merge(
-   player_stats_mia,
-   on="Normalized Name",  # Join on normalized names to handle inconsistencies
-   how="left",            # Keep all salary entries
-   suffixes=("_salary", "_stats")  # Add suffixes to distinguish duplicate columns
-)
+   # ========================================================================
+   # MERGING SALARY AND STATISTICS DATA
+   # ========================================================================
 
+   # Encode the normalized names from both tables as shared integer codes so
+   # the join compares small fixed-size integers instead of hashing strings
+   join_codes, _ = pd.factorize(
+       pd.concat(
+           [miami_df["Normalized Name"], player_stats_mia["Normalized Name"]],
+           ignore_index=True,
+       )
+   )
+   join_codes = join_codes.astype(np.int32)
+   salary_keys = join_codes[:len(miami_df)]
+   stats_keys = join_codes[len(miami_df):]
+
+   # Combine salary and stats data using the encoded names as the matching key
+   # Both tables are indexed by that key so the join aligns on the index
+   # Using left join to keep all salary entries, even if stats aren't found
+   salary_indexed = miami_df.drop(columns=["Normalized Name"]).set_index(
+       pd.Index(salary_keys, name="_join_key")
+   )
+   stats_indexed = player_stats_mia.drop(columns=["Normalized Name"]).set_index(
+       pd.Index(stats_keys, name="_join_key")
+   )
+   miami_combined = salary_indexed.join(
+       stats_indexed,
+       how="left",                          # Keep all salary entries
+       lsuffix="_salary", rsuffix="_stats"  # Add suffixes to distinguish duplicate columns
+   )
 
-# Remove the temporary normalized name column as it's no longer needed
-miami_combined = miami_combined.drop(columns=["Normalized Name"])
 
+   # Remove the temporary join key index as it's no longer needed
+   miami_combined = miami_combined.reset_index(drop=True)
 
-# Ensure salary data is numeric and sort again by salary
-miami_combined["2024-25"] = pd.to_numeric(miami_combined["2024-25"], errors="coerce")
-miami_combined = miami_combined.sort_values(by="2024-25", ascending=False)
 
+   # Make sure salary and all key statistics are in numeric format for
+   # calculations, converting every column in a single pass
+   numeric_cols = ["2024-25", "PTS", "AST", "TRB", "STL", "BLK", "TOV", "FG%", "3P%", "FT%"]
+   miami_combined[numeric_cols] = miami_combined[numeric_cols].apply(pd.to_numeric, errors="coerce")
 
-# ========================================================================
-# PLAYER VALUATION FRAMEWORK
-# ========================================================================
+   # Store positions as a categorical so position checks compare small
+   # integer codes instead of strings
+   miami_combined["Pos"] = miami_combined["Pos"].astype("category")
 
-# Make sure all key statistics are in numeric format for calculations
-for col in ["PTS", "AST", "TRB", "STL", "BLK", "TOV", "FG%", "3P%", "FT%"]:
-   miami_combined[col] = pd.to_numeric(miami_combined[col], errors="coerce")
 
+   # ========================================================================
+   # PLAYER VALUATION FRAMEWORK
+   # ========================================================================
 
-# Define a custom valuation function to assess player value
-# This creates a single score based on weighted statistics and efficiency
-def compute_value(row):
-   # Calculate shooting efficiency if all percentages are available
-   if pd.notnull(row["FG%"]) and pd.notnull(row["3P%"]) and pd.notnull(row["FT%"]):
-       # Average of all shooting percentages
-       efficiency = (row["FG%"] + row["3P%"] + row["FT%"]) / 3
-   else:
-       efficiency = 0
+   # Calculate shooting efficiency as the average of all shooting percentages.
+   # Players missing any of the three percentages get an efficiency of 0
+   has_all_pcts = miami_combined[["FG%", "3P%", "FT%"]].notna().all(axis=1)
+   efficiency = miami_combined[["FG%", "3P%", "FT%"]].mean(axis=1).where(has_all_pcts, 0)
 
    # Calculate base score with weighted stats
    # - Points are counted at face value
@@ -125,106 +220,111 @@ def compute_value(row):
    # - Steals and blocks are weighted 2x (high-impact defensive plays)
    # - Turnovers are subtracted (negative impact)
    score = (
-       row["PTS"] +
-       1.5 * row["AST"] +
-       1.2 * row["TRB"] +
-       2 * row["STL"] +
-       2 * row["BLK"] -
-       row["TOV"]
+       miami_combined["PTS"] +
+       1.5 * miami_combined["AST"] +
+       1.2 * miami_combined["TRB"] +
+       2 * miami_combined["STL"] +
+       2 * miami_combined["BLK"] -
+       miami_combined["TOV"]
    )
-   
-   # Final value = base score * efficiency (rewarding efficient production)
-   return score * efficiency
-
-
-# Calculate value scores for each player
-miami_combined["Value Score"] = miami_combined.apply(compute_value, axis=1)
-
-# Calculate value per million dollars of salary (efficiency metric)
-miami_combined["Value per $M"] = miami_combined["Value Score"] / (miami_combined["2024-25"] / 1e6)
 
+   # Final value = base score * efficiency (rewarding efficient production)
+   # Computed on whole columns at once rather than row by row
+   miami_combined["Value Score"] = score * efficiency
+
+   # Calculate value per million dollars of salary (efficiency metric)
+   miami_combined["Value per $M"] = miami_combined["Value Score"] / (miami_combined["2024-25"] / 1e6)
+
+
+   # Sort the data by value per dollar (best value first)
+   # This is the only sort needed since it alone determines the display order
+   miami_combined = miami_combined.sort_values(by="Value per $M", ascending=False)
+
+
+   # ========================================================================
+   # PLAYER ARCHETYPE CLASSIFICATION
+   # ========================================================================
+
+   # Classify players into basketball archetypes based on their position and
+   # statistical profile. Conditions are checked in priority order: a player
+   # gets the first archetype whose condition they meet
+   pos = miami_combined["Pos"]
+   archetype_conditions = [
+       # 3&D Wing: Shooting guard or small forward with good 3PT% and steals
+       pos.isin(["SG", "SF"]) & (miami_combined["3P%"] > 0.36) & (miami_combined["STL"] > 0.7),
+
+       # Primary Ball Handler: Point guard with high assists
+       pos.eq("PG") & (miami_combined["AST"] > 4),
+
+       # Stretch Big: Power forward or center who can shoot 3s and block shots
+       pos.isin(["PF", "C"]) & (miami_combined["3P%"] > 0.33) & (miami_combined["BLK"] > 0.5),
+
+       # Rim Protector: Center with high blocks and rebounds
+       pos.eq("C") & (miami_combined["BLK"] > 1.0) & (miami_combined["TRB"] > 6),
+
+       # Scoring Guard: Shooting guard or point guard focused on scoring
+       pos.isin(["SG", "PG"]) & (miami_combined["PTS"] > 15) & (miami_combined["AST"] < 4),
+   ]
+   archetype_labels = [
+       "3&D Wing",
+       "Primary Ball Handler",
+       "Stretch Big",
+       "Rim Protector",
+       "Scoring Guard",
+   ]
+
+   # Apply the archetype classification to every player at once
+   # Players who don't fit other archetypes fall back to the default category
+   miami_combined["Archetype"] = np.select(
+       archetype_conditions, archetype_labels, default="Versatile / Role Player"
+   )
 
-# Re-sort the data by value per dollar (best value first)
-miami_combined = miami_combined.sort_values(by="Value per $M", ascending=False)
-
-
-# ========================================================================
-# PLAYER ARCHETYPE CLASSIFICATION
-# ========================================================================
-
-# Define a function to classify players into basketball archetypes
-# based on their position and statistical profile
-def tag_archetype(row):
-   # 3&D Wing: Shooting guard or small forward with good 3PT% and steals
-   if row["Pos"] in ["SG", "SF"] and row["3P%"] > 0.36 and row["STL"] > 0.7:
-       return "3&D Wing"
-   
-   # Primary Ball Handler: Point guard with high assists
-   elif row["Pos"] in ["PG"] and row["AST"] > 4:
-       return "Primary Ball Handler"
-   
-   # Stretch Big: Power forward or center who can shoot 3s and block shots
-   elif row["Pos"] in ["PF", "C"] and row["3P%"] > 0.33 and row["BLK"] > 0.5:
-       return "Stretch Big"
-   
-   # Rim Protector: Center with high blocks and rebounds
-   elif row["Pos"] in ["C"] and row["BLK"] > 1.0 and row["TRB"] > 6:
-       return "Rim Protector"
-   
-   # Scoring Guard: Shooting guard or point guard focused on scoring
-   elif row["Pos"] in ["SG", "PG"] and row["PTS"] > 15 and row["AST"] < 4:
-       return "Scoring Guard"
-   
-   # Default category for players who don't fit other archetypes
-   else:
-       return "Versatile / Role Player"
-
-
-# Apply the archetype classification to each player
-miami_combined["Archetype"] = miami_combined.apply(tag_archetype, axis=1)
-
-
-# Create a summary table of how many players are in each archetype
-archetype_table = miami_combined["Archetype"].value_counts().reset_index()
-archetype_table.columns = ["Archetype", "Player Count"]
 
+   # Create a summary table of how many players are in each archetype
+   archetype_table = miami_combined["Archetype"].value_counts().reset_index()
+   archetype_table.columns = ["Archetype", "Player Count"]
 
-# ========================================================================
-# RESULTS DISPLAY - PLAYER VALUATION
-# ========================================================================
 
-# Display the detailed player valuation data
-print("\n🏀 Miami Heat Player Valuation:")
-print(miami_combined[[
-   "Name", "Pos", "2024-25", "PTS", "AST", "TRB", "STL", "BLK", "TOV",
-   "FG%", "3P%", "FT%", "Value Score", "Value per $M", "Archetype"
-]])
+   # ========================================================================
+   # RESULTS DISPLAY - PLAYER VALUATION
+   # ========================================================================
 
+   # Display the detailed player valuation data
+   # to_string formats the chosen columns straight from the combined table
+   print("\n🏀 Miami Heat Player Valuation:", file=out)
+   print(miami_combined.to_string(columns=[
+       "Name", "Pos", "2024-25", "PTS", "AST", "TRB", "STL", "BLK", "TOV",
+       "FG%", "3P%", "FT%", "Value Score", "Value per $M", "Archetype"
+   ], index=False), file=out)
 
-# ========================================================================
-# RESULTS DISPLAY - ARCHETYPE BREAKDOWN
-# ========================================================================
 
-# Display the count of players in each archetype
-print("\n📊 Archetype Breakdown Table:")
-print(archetype_table)
+   # ========================================================================
+   # RESULTS DISPLAY - ARCHETYPE BREAKDOWN
+   # ========================================================================
 
+   # Display the count of players in each archetype
+   print("\n📊 Archetype Breakdown Table:", file=out)
+   print(archetype_table, file=out)
 
-# Create a summary of players in each archetype category
-archetype_summary = miami_combined.groupby("Archetype")["Name"].apply(list).reset_index()
-archetype_summary.columns = ["Archetype", "Players"]
 
+   # Create a summary of the players in each archetype category along with
+   # their count, building both columns in a single grouping pass
+   archetype_summary = (
+       miami_combined.groupby("Archetype")["Name"]
+       .agg(**{"Players": list, "Player Count": "size"})
+       .reset_index()
+   )
 
-# Add player count column to the summary
-archetype_summary["Player Count"] = archetype_summary["Players"].apply(len)
 
+   # Display a detailed breakdown of which players are in each archetype
+   # The lines are collected first and written out in a single call
+   breakdown_lines = ["\n📋 Archetype Breakdown with Player Names:\n"]
+   for archetype, players in zip(archetype_summary["Archetype"], archetype_summary["Players"]):
+       breakdown_lines.append(f"\n🔹 {archetype} ({len(players)} players):\n")
+       breakdown_lines.extend(f"   - {name}\n" for name in players)
+   out.write("".join(breakdown_lines))
 
-# Display a detailed breakdown of which players are in each archetype
-print("\n📋 Archetype Breakdown with Player Names:")
-for index, row in archetype_summary.iterrows():
-   print(f"\n🔹 {row['Archetype']} ({row['Player Count']} players):")
-   for name in row["Players"]:
-       print(f"   - {name}")
+   return miami_combined, archetype_table, archetype_summary
 
 
 # ========================================================================
@@ -233,7 +333,7 @@ for index, row in archetype_summary.iterrows():
 
 # Manually constructed dataset containing contract status information
 # This data may not be readily available in the main dataset and requires additional research
-heat_fa_status = [
+_HEAT_FA_STATUS = [
     {
         "Player": "Duncan Robinson",
         "Pos": "SF",
@@ -299,9 +399,30 @@ heat_fa_status = [
     }
 ]
 
-# Convert the contract status data to a DataFrame for display
-df = pd.DataFrame(heat_fa_status)
 
-# Display the 2025 contract status information
-print("\n📋 Miami Heat - 2025 Contract Status Overview\n")
-print(df[["Player", "Pos", "Age", "Status", "Free Agent?", "Explanation"]].to_string(index=False))
+# Build the contract status DataFrame from the static data above
+# The data never changes, so the DataFrame is built once and reused
+# (callers must treat it as read-only)
+@lru_cache(maxsize=1)
+def fa_status_df():
+   return pd.DataFrame(_HEAT_FA_STATUS)
+
+
+# Print the 2025 contract status overview for Miami Heat players to the given
+# text stream (standard output by default)
+def print_fa_status(out=None):
+   if out is None:
+       out = sys.stdout
+   df = fa_status_df()
+
+   # Display the 2025 contract status information
+   print("\n📋 Miami Heat - 2025 Contract Status Overview\n", file=out)
+   print(df[["Player", "Pos", "Age", "Status", "Free Agent?", "Explanation"]].to_string(index=False), file=out)
+
+
+if __name__ == "__main__":
+   # Build the whole report in memory and write it to stdout in one go
+   report = io.StringIO()
+   analyze_heat(report)
+   print_fa_status(report)
+   sys.stdout.write(report.getvalue())